@@ -27,6 +27,8 @@ This implementation is pretty simple. That simplicity comes with a few costs:
    based on whichever rule comes first in reduce().
 """
 
+import time
+
 # The primitive terms in our language. Using strings rather than True, False and
 # 0 ensures these terms don't accidentally inherit any semantics from Python.
 true_ = 'true'
@@ -167,6 +169,48 @@ def evaluate(term):
         return term
 
 
+class Continuation:
+    """A partly evaluated term returned by `evaluate_bounded()`.
+
+    `term` is the result of the steps taken so far. Call `resume()` to carry on
+    evaluating from where we left off.
+    """
+
+    def __init__(self, term):
+        self.term = term
+
+    def __repr__(self):
+        return f'Continuation({self.term!r})'
+
+    def resume(self, max_steps=None, deadline=None):
+        """Continue evaluating. The arguments are as for `evaluate_bounded()`."""
+        return evaluate_bounded(self.term, max_steps, deadline)
+
+
+def evaluate_bounded(term, max_steps=None, deadline=None):
+    """Reduce `term` repeatedly until it cannot be reduced further or we run out of time.
+
+    This is the same as `evaluate()` except that it will stop after taking
+    `max_steps` single-step reductions or once `time.monotonic()` has passed
+    `deadline`, whichever comes first. If either is None then that limit does
+    not apply.
+
+    Returns the result of evaluating `term` if evaluation finished, otherwise
+    returns a `Continuation` which can be used to resume the evaluation later.
+    """
+    steps = 0
+    while True:
+        if max_steps is not None and steps >= max_steps:
+            return Continuation(term)
+        if deadline is not None and time.monotonic() >= deadline:
+            return Continuation(term)
+        try:
+            term = reduce(term)
+        except NoValidReduction:
+            return term
+        steps += 1
+
+
 if __name__ == '__main__':
     # Evaluate an example term. I've picked this term because it uses all 10
     # rules during its evaluation.
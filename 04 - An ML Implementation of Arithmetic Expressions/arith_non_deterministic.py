@@ -12,6 +12,10 @@ contains two main improvements.
    E-Funny2) which introduce exactly that sort of non determinism.
 """
 
+import time
+
+import rule_profiling
+
 
 class AbstractTerm:
     """Abstract superclass of the non-primitive terms in our language.
@@ -234,9 +238,20 @@ def reduce(term, rules):
     rules match then nothing will be yielded.
 
     This is roughly equivalent to the `eval1` function in Chapter 4's OCaml code.
+
+    The call and each rule tried are recorded if
+    `rule_profiling.profile_rules()` is active.
     """
+    if rule_profiling.active is None:
+        for rule in rules:
+            yield from rule(term, rules)
+    else:
+        yield from rule_profiling.active.call('reduce', _reduce_profiled, term, rules)
+
+
+def _reduce_profiled(term, rules):
     for rule in rules:
-        yield from rule(term, rules)
+        yield from rule_profiling.active.run(rule, term, rules)
 
 
 def evaluate(term, rules):
@@ -258,6 +273,74 @@ def evaluate(term, rules):
         yield term
 
 
+class Continuation:
+    """A partly finished evaluation returned by `evaluate_bounded()`.
+
+    `results` holds the normal forms found so far and `frontier` is a stack of
+    the terms which still need evaluating, with the next one to be reduced at
+    the end. Call `resume()` to carry on evaluating from where we left off.
+    """
+
+    def __init__(self, frontier, results, rules):
+        self.frontier = frontier
+        self.results = results
+        self.rules = rules
+
+    def __repr__(self):
+        return f'Continuation(frontier={self.frontier!r}, results={self.results!r})'
+
+    def resume(self, max_steps=None, deadline=None, in_place=False):
+        """Continue evaluating. `max_steps` and `deadline` are as for `evaluate_bounded()`.
+
+        By default the continuation itself is not modified so it can be resumed
+        again. That means copying `frontier` and `results`, which costs time
+        proportional to their length on every call. That adds up when an
+        evaluation with a large frontier (e.g. using E_Funny2) is resumed many
+        times with small budgets. Pass `in_place=True` to avoid the copy. The
+        continuation's lists are then used by the evaluation and it must not
+        be resumed again; resume the returned continuation instead.
+        """
+        if in_place:
+            (frontier, results) = (self.frontier, self.results)
+        else:
+            (frontier, results) = (list(self.frontier), list(self.results))
+        return _evaluate_frontier(frontier, results, self.rules, max_steps, deadline)
+
+
+def evaluate_bounded(term, rules, max_steps=None, deadline=None):
+    """Return all results of reducing `term` using `rules` unless we run out of time.
+
+    This finds the same results, in the same order, as `evaluate()` except that
+    it will stop after reducing `max_steps` terms or once `time.monotonic()` has
+    passed `deadline`, whichever comes first. If either is None then that limit
+    does not apply.
+
+    Returns a list of the results of evaluating `term` if evaluation finished,
+    otherwise returns a `Continuation` which can be used to resume the
+    evaluation later.
+    """
+    return _evaluate_frontier([term], [], rules, max_steps, deadline)
+
+
+def _evaluate_frontier(frontier, results, rules, max_steps, deadline):
+    # This is the depth first search done by the recursion in evaluate() but
+    # with an explicit stack so that we can stop and resume it.
+    steps = 0
+    while frontier:
+        if max_steps is not None and steps >= max_steps:
+            return Continuation(frontier, results, rules)
+        if deadline is not None and time.monotonic() >= deadline:
+            return Continuation(frontier, results, rules)
+        term = frontier.pop()
+        reductions = list(reduce(term, rules))
+        if reductions:
+            frontier.extend(reversed(reductions))
+        else:
+            results.append(term)
+        steps += 1
+    return results
+
+
 if __name__ == '__main__':
     # Demonstrate non-determinism using E_Funny1
     term = if_(true_, true_, false_)
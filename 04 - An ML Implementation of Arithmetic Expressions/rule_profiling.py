@@ -0,0 +1,134 @@
+"""Opt-in instrumentation which records how each evaluation rule performs.
+
+Profiling is switched on with the `profile_rules()` context manager which
+returns a `RuleStats` object. While it is active every call to
+`arith_non_deterministic.reduce()` is recorded in `calls`, and every rule it
+tries is recorded in `rules`. For example:
+
+    with profile_rules() as stats:
+        list(evaluate(term, rules_inc_funny_2))
+    print(stats.to_json())
+    stats.dump_stats('rules.prof')  # Can be loaded by pstats or snakeviz.
+
+`tapl.profiling` records the typing rules of chapter 9 in the same shape.
+
+When profiling is not active the only overhead is a single check of
+`rule_profiling.active` per call to `reduce()`.
+
+This module isn't called `profiling` because that would shadow the standard
+library's `profiling` package in Python 3.15.
+"""
+
+import contextlib
+import json
+import marshal
+import time
+
+
+# The RuleStats object being recorded into or None if profiling is not active.
+active = None
+
+
+class Stat:
+    """The performance of a single rule or function."""
+
+    def __init__(self):
+        self.attempts = 0
+        self.successes = 0
+        # Time spent in the rule itself, excluding the rules it called.
+        self.time = 0.0
+        # Time spent in the rule including the rules it called.
+        self.cumulative_time = 0.0
+
+    def as_dict(self):
+        return dict(self.__dict__)
+
+
+class RuleStats:
+    """Counts of attempts, successes and time taken per rule and per function call."""
+
+    def __init__(self):
+        self.rules = {}
+        self.calls = {}
+        self._functions = {}
+        # For each rule or function currently being run the amount of time
+        # spent in the rules and functions it called. Used to calculate
+        # Stat.time.
+        self._child_times = []
+        # Number of active calls per rule or function so recursive calls
+        # don't count their time twice in Stat.cumulative_time.
+        self._depth = {}
+
+    def __getitem__(self, name):
+        return self.rules[name]
+
+    def run(self, rule, *args):
+        """Call the generator function `rule` with `args` and record how it went in `rules`.
+
+        Returns a list of everything `rule` generated. The results have to be
+        collected eagerly so that the time taken by whoever consumes them isn't
+        blamed on `rule`.
+        """
+        return self._record('rules', rule.__name__, rule, args)
+
+    def call(self, name, function, *args):
+        """Like `run()` but records the call to `function` in `calls` under `name`."""
+        return self._record('calls', name, function, args)
+
+    def _record(self, kind, name, function, args):
+        key = (kind, name)
+        stats = getattr(self, kind)
+        stat = stats.get(name)
+        if stat is None:
+            stat = stats[name] = Stat()
+            self._functions[key] = function
+        self._child_times.append(0.0)
+        self._depth[key] = self._depth.get(key, 0) + 1
+        start = time.perf_counter()
+        try:
+            results = list(function(*args))
+        finally:
+            elapsed = time.perf_counter() - start
+            self._depth[key] -= 1
+            child_time = self._child_times.pop()
+            if self._child_times:
+                self._child_times[-1] += elapsed
+            stat.attempts += 1
+            stat.time += elapsed - child_time
+            if not self._depth[key]:
+                stat.cumulative_time += elapsed
+        if results:
+            stat.successes += 1
+        return results
+
+    def to_json(self, **kwargs):
+        """Return the stats as a JSON string. `kwargs` are passed to json.dumps()."""
+        return json.dumps({
+            'rules': {name: stat.as_dict() for (name, stat) in self.rules.items()},
+            'calls': {name: stat.as_dict() for (name, stat) in self.calls.items()},
+        }, **kwargs)
+
+    def dump_stats(self, filename):
+        """Write the stats to `filename` in the format used by cProfile.
+
+        The resulting file can be loaded with `pstats.Stats(filename)`.
+        """
+        stats = {}
+        for kind in ('rules', 'calls'):
+            for (name, stat) in getattr(self, kind).items():
+                code = self._functions[kind, name].__code__
+                key = (code.co_filename, code.co_firstlineno, name)
+                stats[key] = (stat.attempts, stat.attempts, stat.time, stat.cumulative_time, {})
+        with open(filename, 'wb') as f:
+            marshal.dump(stats, f)
+
+
+@contextlib.contextmanager
+def profile_rules():
+    """Record the performance of every rule tried inside the `with` block."""
+    global active
+    previous, active = active, RuleStats()
+    try:
+        yield active
+    finally:
+        active = previous
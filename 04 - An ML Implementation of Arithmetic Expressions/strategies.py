@@ -0,0 +1,188 @@
+"""Pluggable reduction strategies for the `arith` language.
+
+`reduce()` in `arith.py` and `arith_non_deterministic.py` rewrites a single
+redex per step, in the position picked out by the congruence rules, and
+rebuilds every term between the root and that redex. This module separates
+*where* to look for a redex (a strategy) from *how* to contract it (the
+computation rules in `rules`) so that different strategies can be compared on
+the same terms.
+
+Like the congruence rules (E-If, E-Succ, E-Pred and E-IsZero) the strategies
+only reduce the condition of an `if` and the argument of `succ`, `pred` and
+`iszero`. They never reduce the branches of an `if`. A term is only a redex if
+that subterm is a value, and values don't contain redexes. So a term has at
+most one redex in these positions, and every strategy takes exactly the same
+steps as `evaluate()`. This includes terms which get stuck. What differs is
+how much of the term each strategy searches to find the redex.
+
+The strategies are:
+ - LeftmostInnermost: look for a redex in the subterm first, then try the term.
+ - LeftmostOutermost: try the term first, then look for a redex in the subterm.
+ - FullStepParallel: contract every redex in the term in a single traversal.
+
+Each strategy counts the `steps` it takes, the `allocations` (new terms built)
+it makes and the `attempts` it makes to contract a term. For example:
+    strategy = FullStepParallel()
+    normal_form = strategy.normalise(term)
+    print(strategy.steps, strategy.allocations, strategy.attempts)
+"""
+
+from arith_non_deterministic import *
+
+
+def subterms(term):
+    """Return a list of the immediate subterms of `term` in left to right order."""
+    # AbstractTerm stores its subterms in its __dict__ in template order.
+    return list(term.__dict__.values())
+
+
+# The positions in `subterms()` which the congruence rules reduce.
+_congruence_positions = {if_: (0,), succ_: (0,), pred_: (0,), iszero_: (0,)}
+
+
+def congruence_positions(term):
+    """Return the positions of the subterms of `term` which the congruence rules reduce."""
+    return _congruence_positions.get(type(term), ())
+
+
+def contract(term, rules):
+    """Return the result of contracting `term` itself using `rules`, or None if `term` is not a redex.
+
+    Only the computation rules (those without premises) can contract a redex.
+    Passing an empty list of rules to each rule means the congruence rules
+    can never satisfy their premises and so never match.
+    """
+    for rule in rules:
+        for result in rule(term, []):
+            return result
+    return None
+
+
+class Strategy:
+    """Abstract superclass of reduction strategies.
+
+    Subclasses need to define `_step(term)` which returns the result of a
+    single step of reduction, or None if `term` is in normal form.
+    """
+
+    def __init__(self, rules=rules):
+        self.rules = rules
+        self.steps = 0
+        self.allocations = 0
+        self.attempts = 0
+
+    def __repr__(self):
+        return f'{type(self).__name__}(steps={self.steps}, allocations={self.allocations}, attempts={self.attempts})'
+
+    def step(self, term):
+        """Return the result of reducing `term` a single step, or None if `term` is in normal form."""
+        result = self._step(term)
+        if result is not None:
+            self.steps += 1
+        return result
+
+    def normalise(self, term):
+        """Reduce `term` repeatedly until it is in normal form and return that normal form."""
+        while True:
+            result = self.step(term)
+            if result is None:
+                return term
+            term = result
+
+    def _contract(self, term):
+        self.attempts += 1
+        return contract(term, self.rules)
+
+    def _rebuild(self, term, children):
+        """Return a new term of the same kind as `term` with `children` as its subterms."""
+        self.allocations += 1
+        return type(term)(*children)
+
+
+class LeftmostInnermost(Strategy):
+    """Look for a redex in the subterm first, then try the term itself."""
+
+    def _step(self, term):
+        children = subterms(term)
+        for i in congruence_positions(term):
+            result = self._step(children[i])
+            if result is not None:
+                return self._rebuild(term, children[:i] + [result] + children[i+1:])
+        return self._contract(term)
+
+
+class LeftmostOutermost(Strategy):
+    """Try the term itself first, then look for a redex in the subterm."""
+
+    def _step(self, term):
+        result = self._contract(term)
+        if result is not None:
+            return result
+        children = subterms(term)
+        for i in congruence_positions(term):
+            result = self._step(children[i])
+            if result is not None:
+                return self._rebuild(term, children[:i] + [result] + children[i+1:])
+        return None
+
+
+class FullStepParallel(Strategy):
+    """Contract every redex in the term in a single traversal.
+
+    All the redexes in the original term are contracted at once, but any new
+    redexes this creates are left for the next step. With the rules of `arith`
+    there is only ever one redex, but this visits every term on the path to
+    the bottom of the term to make sure.
+    """
+
+    def _step(self, term):
+        children = subterms(term)
+        results = [None] * len(children)
+        for i in congruence_positions(term):
+            results[i] = self._step(children[i])
+        contracted = self._contract(term)
+        if contracted is not None:
+            # The contractum is either one of our subterms, in which case we
+            # want the reduced version of it, or a numeric value or constant,
+            # which can't contain any redexes.
+            for (child, result) in zip(children, results):
+                if contracted is child:
+                    return child if result is None else result
+            return contracted
+        if any(result is not None for result in results):
+            return self._rebuild(term, [
+                child if result is None else result
+                for (child, result) in zip(children, results)
+            ])
+        return None
+
+
+strategies = [LeftmostInnermost, LeftmostOutermost, FullStepParallel]
+
+
+def nested_conditions(depth):
+    """Return an `if` whose condition is an `if` `depth` levels deep, with the only redex at the bottom."""
+    if depth == 0:
+        return iszero_(pred_(succ_(zero_)))
+    return if_(nested_conditions(depth - 1), true_, false_)
+
+
+if __name__ == '__main__':
+    corpus = {
+        'nested conditions': nested_conditions(6),
+        'succ spine': succ_(succ_(succ_(pred_(succ_(pred_(succ_(pred_(zero_)))))))),
+        'pred spine': pred_(pred_(pred_(succ_(succ_(succ_(zero_)))))),
+        'example': if_(
+            if_(iszero_(succ_(pred_(succ_(zero_)))), zero_, iszero_(zero_)),
+            succ_(pred_(succ_(pred_(zero_)))),
+            false_
+        ),
+    }
+    for (name, term) in corpus.items():
+        print(f'{name}: {term}')
+        for strategy_class in strategies:
+            strategy = strategy_class()
+            normal_form = strategy.normalise(term)
+            print(f'    {strategy_class.__name__:18} steps={strategy.steps:<4} allocations={strategy.allocations:<4} '
+                  f'attempts={strategy.attempts:<4} -> {normal_form}')
+        print()
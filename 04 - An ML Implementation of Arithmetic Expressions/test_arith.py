@@ -93,3 +93,25 @@ def test_evaluate_large_expression():
     )
     expected_result = succ_(zero_)
     assert evaluate(test_input) == expected_result
+
+
+def test_evaluate_bounded_finishes_within_budget():
+    test_input = if_(iszero_(zero_), succ_(pred_(zero_)), false_)
+    assert evaluate_bounded(test_input, max_steps=10) == succ_(zero_)
+
+
+def test_evaluate_bounded_returns_resumable_continuation():
+    test_input = if_(iszero_(zero_), succ_(pred_(zero_)), false_)
+    result = evaluate_bounded(test_input, max_steps=1)
+    assert isinstance(result, Continuation)
+    assert result.term == if_(true_, succ_(pred_(zero_)), false_)
+    result = result.resume(max_steps=1)
+    assert result.term == succ_(pred_(zero_))
+    assert result.resume() == succ_(zero_)
+
+
+def test_evaluate_bounded_stops_at_deadline():
+    test_input = succ_(pred_(zero_))
+    result = evaluate_bounded(test_input, deadline=0)
+    assert isinstance(result, Continuation)
+    assert result.term == test_input
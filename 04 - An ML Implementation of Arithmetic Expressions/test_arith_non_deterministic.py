@@ -0,0 +1,45 @@
+import pytest
+
+from arith_non_deterministic import *
+
+
+funny_term = if_(true_, pred_(succ_(pred_(zero_))), if_(false_, zero_, true_))
+
+
+@pytest.mark.parametrize("test_rules", [rules, rules_inc_funny_1, rules_inc_funny_2])
+def test_evaluate_bounded_matches_evaluate(test_rules):
+    assert evaluate_bounded(funny_term, test_rules) == list(evaluate(funny_term, test_rules))
+
+
+@pytest.mark.parametrize("test_rules", [rules, rules_inc_funny_1, rules_inc_funny_2])
+def test_evaluate_bounded_can_be_resumed_one_step_at_a_time(test_rules):
+    result = evaluate_bounded(funny_term, test_rules, max_steps=1)
+    steps = 1
+    while isinstance(result, Continuation):
+        result = result.resume(max_steps=1)
+        steps += 1
+    assert result == list(evaluate(funny_term, test_rules))
+    assert steps > 1
+
+
+@pytest.mark.parametrize("test_rules", [rules, rules_inc_funny_2])
+def test_evaluate_bounded_can_be_resumed_in_place(test_rules):
+    result = evaluate_bounded(funny_term, test_rules, max_steps=1)
+    while isinstance(result, Continuation):
+        previous = result
+        result = result.resume(max_steps=1, in_place=True)
+        if isinstance(result, Continuation):
+            assert result.frontier is previous.frontier
+    assert result == list(evaluate(funny_term, test_rules))
+
+
+def test_continuation_can_be_resumed_more_than_once():
+    continuation = evaluate_bounded(funny_term, rules_inc_funny_2, max_steps=2)
+    assert continuation.resume() == continuation.resume()
+
+
+def test_evaluate_bounded_stops_at_deadline():
+    result = evaluate_bounded(funny_term, rules, deadline=0)
+    assert isinstance(result, Continuation)
+    assert result.frontier == [funny_term]
+    assert result.results == []
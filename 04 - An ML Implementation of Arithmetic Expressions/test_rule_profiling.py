@@ -0,0 +1,64 @@
+import json
+import pstats
+
+import rule_profiling
+from arith_non_deterministic import *
+
+
+term = if_(iszero_(pred_(succ_(zero_))), succ_(zero_), false_)
+
+
+def test_profiling_is_inactive_by_default():
+    assert rule_profiling.active is None
+    assert list(evaluate(term, rules)) == [succ_(zero_)]
+
+
+def test_profile_rules_records_attempts_and_successes():
+    with rule_profiling.profile_rules() as stats:
+        assert list(evaluate(term, rules)) == [succ_(zero_)]
+    assert rule_profiling.active is None
+    # Every step tries all of the rules, plus the congruence rules recurse.
+    assert stats['E_IfTrue'].attempts == stats['E_IsZero'].attempts
+    assert stats['E_IfTrue'].successes == 1
+    assert stats['E_IsZeroZero'].successes == 1
+    assert stats['E_PredSucc'].successes == 1
+    assert stats['E_If'].successes == 2
+    assert 'E_Funny2' not in stats.rules
+
+
+def test_profile_rules_records_calls_to_reduce():
+    with rule_profiling.profile_rules() as stats:
+        list(evaluate(term, rules))
+    reduce_stat = stats.calls['reduce']
+    # Each of the three steps succeeds at the top level and once more for
+    # each congruence rule used. The last call finds the normal form.
+    congruence_rules = ('E_If', 'E_Succ', 'E_Pred', 'E_IsZero')
+    assert reduce_stat.successes == 3 + sum(stats[name].successes for name in congruence_rules)
+    assert reduce_stat.attempts > reduce_stat.successes
+    assert 0 <= reduce_stat.time <= reduce_stat.cumulative_time
+
+
+def test_to_json_separates_rules_from_calls():
+    with rule_profiling.profile_rules() as stats:
+        list(evaluate(term, rules))
+    data = json.loads(stats.to_json())
+    assert set(data) == {'rules', 'calls'}
+    assert set(data['calls']) == {'reduce'}
+    assert data['rules']['E_IfTrue'] == stats['E_IfTrue'].as_dict()
+    assert set(data['rules']['E_IfTrue']) == {'attempts', 'successes', 'time', 'cumulative_time'}
+
+
+def test_profile_rules_cumulative_time_includes_nested_rules():
+    with rule_profiling.profile_rules() as stats:
+        list(evaluate(term, rules))
+    for stat in stats.rules.values():
+        assert 0 <= stat.time <= stat.cumulative_time
+
+
+def test_dump_stats_can_be_loaded_by_pstats(tmp_path):
+    with rule_profiling.profile_rules() as stats:
+        list(evaluate(term, rules_inc_funny_2))
+    filename = str(tmp_path / 'rules.prof')
+    stats.dump_stats(filename)
+    loaded = pstats.Stats(filename)
+    assert loaded.total_calls == sum(stat.attempts for stat in [*stats.rules.values(), *stats.calls.values()])
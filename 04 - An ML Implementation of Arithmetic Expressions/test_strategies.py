@@ -0,0 +1,80 @@
+import pytest
+
+from strategies import *
+
+corpus = [
+    true_,
+    succ_(zero_),
+    if_(zero_, pred_(zero_), iszero_(zero_)),
+    if_(true_, pred_(zero_), false_),
+    succ_(succ_(succ_(pred_(succ_(pred_(succ_(pred_(zero_)))))))),
+    pred_(pred_(pred_(succ_(succ_(succ_(zero_)))))),
+    iszero_(if_(false_, true_, pred_(succ_(pred_(zero_))))),
+    succ_(pred_(true_)),
+    if_(
+        if_(iszero_(succ_(pred_(succ_(zero_)))), zero_, iszero_(zero_)),
+        succ_(pred_(succ_(pred_(zero_)))),
+        false_
+    ),
+    if_(iszero_(zero_), if_(zero_, true_, false_), pred_(zero_)),
+    nested_conditions(4),
+]
+
+
+@pytest.mark.parametrize("test_input", corpus)
+@pytest.mark.parametrize("strategy_class", strategies)
+def test_strategies_agree_with_evaluate(strategy_class, test_input):
+    assert strategy_class().normalise(test_input) == next(evaluate(test_input, rules))
+
+
+@pytest.mark.parametrize("test_input", corpus)
+@pytest.mark.parametrize("strategy_class", strategies)
+def test_strategies_take_the_same_steps_as_reduce(strategy_class, test_input):
+    strategy = strategy_class()
+    term = test_input
+    while True:
+        expected = next(reduce(term, rules), None)
+        term = strategy.step(term)
+        assert term == expected
+        if term is None:
+            break
+
+
+@pytest.mark.parametrize("strategy_class", strategies)
+def test_step_returns_none_for_normal_forms(strategy_class):
+    strategy = strategy_class()
+    assert strategy.step(succ_(pred_(true_))) is None
+    # Stuck, and the redexes in the branches are never reduced.
+    assert strategy.step(if_(zero_, pred_(zero_), iszero_(zero_))) is None
+    assert strategy.steps == 0
+    assert strategy.allocations == 0
+
+
+@pytest.mark.parametrize("strategy_class", strategies)
+def test_only_terms_on_the_path_to_the_redex_are_rebuilt(strategy_class):
+    strategy = strategy_class()
+    assert strategy.step(succ_(succ_(pred_(zero_)))) == succ_(succ_(zero_))
+    assert strategy.steps == 1
+    assert strategy.allocations == 2
+
+
+def test_outermost_finds_redexes_near_the_root_with_fewer_attempts():
+    test_input = pred_(succ_(succ_(succ_(zero_))))
+    (innermost, outermost) = (LeftmostInnermost(), LeftmostOutermost())
+    assert innermost.step(test_input) == outermost.step(test_input) == succ_(succ_(zero_))
+    assert outermost.attempts == 1
+    assert innermost.attempts == 5
+
+
+def test_innermost_finds_redexes_near_the_bottom_with_fewer_attempts():
+    test_input = nested_conditions(3)
+    (innermost, outermost) = (LeftmostInnermost(), LeftmostOutermost())
+    assert innermost.step(test_input) == outermost.step(test_input)
+    assert innermost.attempts == 3
+    assert outermost.attempts == 5
+
+
+def test_full_step_parallel_tries_every_term_on_the_path():
+    strategy = FullStepParallel()
+    strategy.step(pred_(succ_(succ_(succ_(zero_)))))
+    assert strategy.attempts == 5
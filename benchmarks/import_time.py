@@ -0,0 +1,58 @@
+"""Measure how long it takes to import the `tapl` package.
+
+Runs a fresh interpreter with `python -X importtime` for each scenario and
+reports the cumulative import time of the top level module. For example:
+    $ python benchmarks/import_time.py
+    import tapl                                      2.4 ms
+    from tapl import SimplyTypedLambdaCalculus     ...
+
+`import tapl` should be a small fraction of the cost of actually using a
+chapter, since the chapter modules are only imported on first use.
+"""
+
+import os
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCENARIOS = [
+    'import tapl',
+    'from tapl import SimplyTypedLambdaCalculus',
+]
+
+
+def import_time(statement, repeat=5):
+    """Return the best cumulative import time of `tapl` in ms for `statement`.
+
+    `python -X importtime` writes one line per module to stderr in the form:
+        import time: self [us] | cumulative | imported package
+    The cumulative figure for the `tapl` line includes everything it imported.
+    Looking up a lazy name imports the chapter module outside of the `tapl`
+    line so we sum the cumulative times of all of the `tapl` lines.
+    """
+    best = None
+    for _ in range(repeat):
+        completed = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', statement],
+            cwd=REPO_ROOT, capture_output=True, text=True, check=True,
+        )
+        total = 0
+        for line in completed.stderr.splitlines():
+            if not line.startswith('import time:'):
+                continue
+            _, cumulative, module = line[len('import time:'):].split('|')
+            # Nested modules are indented further, so this only matches top
+            # level tapl modules and their children aren't counted twice.
+            if module.startswith(' tapl'):
+                total += int(cumulative)
+        best = total if best is None else min(best, total)
+    return best / 1000
+
+
+if __name__ == '__main__':
+    for statement in SCENARIOS:
+        try:
+            print(f'{statement:45} {import_time(statement):6.1f} ms')
+        except subprocess.CalledProcessError as e:
+            print(f'{statement:45} failed:', e.stderr.strip().splitlines()[-1])
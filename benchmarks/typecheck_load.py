@@ -0,0 +1,113 @@
+"""Generate load against a running `tapl.server` and report its latency.
+
+Start the server and then run this script against it. For example:
+    $ python -m tapl.server --port 8765 &
+    $ python benchmarks/typecheck_load.py --port 8765 --connections 8 --requests 1000
+
+Each connection sends expressions picked at random from a small corpus, keeping
+up to `--pipeline` requests in flight at once. Picking from a small corpus
+means that some concurrent requests are identical, which exercises the
+server's deduplication. Pass `--large` to add the 18K character term from
+`data/large_lambda_term.txt` to the corpus.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+sys.path.insert(0, REPO_ROOT)
+
+from tapl.server import DEFAULT_MAX_LINE
+
+CORPUS = [
+    ('(λx:Bool. x) true', '∅'),
+    ('f (if false then true else false)', 'f:(Bool→Bool), ∅'),
+    ('λx:Bool. f(if false then true else false)', 'f:(Bool→Bool), ∅'),
+    ('(if (if true then false else (if false then true else (if false then false else false))) then true else true)', '∅'),
+    ('((λs:(((Bool → Bool) → (Bool → Bool)) → (Bool → ((Bool → Bool) → (Bool → Bool)))). false) '
+     '(λv:((Bool → Bool) → (Bool → Bool)). (λj:Bool. v)))', '∅'),
+    ('(λx:Bool. λy:Bool. y)(true true)', '∅'),
+]
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+async def run_connection(args, corpus, latencies, rng):
+    if args.unix is not None:
+        reader, writer = await asyncio.open_unix_connection(args.unix, limit=args.max_line)
+    else:
+        reader, writer = await asyncio.open_connection(args.host, args.port, limit=args.max_line)
+    sent_at = {}
+    in_flight = asyncio.Semaphore(args.pipeline)
+
+    async def receive():
+        for _ in range(args.requests):
+            response = json.loads(await reader.readline())
+            latencies.append(time.perf_counter() - sent_at.pop(response['id']))
+            in_flight.release()
+
+    receiver = asyncio.create_task(receive())
+    for i in range(args.requests):
+        await in_flight.acquire()
+        (expression, context) = rng.choice(corpus)
+        request = {'id': i, 'expression': expression, 'context': context, 'proof': args.proof}
+        sent_at[i] = time.perf_counter()
+        writer.write(json.dumps(request, ensure_ascii=False).encode() + b'\n')
+        await writer.drain()
+    await receiver
+    writer.close()
+
+
+async def fetch_metrics(args):
+    if args.unix is not None:
+        reader, writer = await asyncio.open_unix_connection(args.unix, limit=args.max_line)
+    else:
+        reader, writer = await asyncio.open_connection(args.host, args.port, limit=args.max_line)
+    writer.write(b'{"metrics": true}\n')
+    response = json.loads(await reader.readline())
+    writer.close()
+    return response['metrics']
+
+
+async def main(args):
+    corpus = list(CORPUS)
+    if args.large:
+        with open(os.path.join(REPO_ROOT, 'data', 'large_lambda_term.txt')) as f:
+            corpus.append((f.read(), '∅'))
+    rng = random.Random(args.seed)
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*[
+        run_connection(args, corpus, latencies, random.Random(rng.random()))
+        for _ in range(args.connections)
+    ])
+    elapsed = time.perf_counter() - start
+
+    print(f'Requests:   {len(latencies)} in {elapsed:.2f}s ({len(latencies) / elapsed:.0f}/s)')
+    print(f'Client p50: {percentile(latencies, 50) * 1000:.2f} ms')
+    print(f'Client p99: {percentile(latencies, 99) * 1000:.2f} ms')
+    print('Server:    ', json.dumps(await fetch_metrics(args)))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--unix', metavar='PATH', help='connect to a Unix socket rather than TCP')
+    parser.add_argument('--connections', type=int, default=4)
+    parser.add_argument('--requests', type=int, default=250, help='requests per connection')
+    parser.add_argument('--pipeline', type=int, default=8, help='requests in flight per connection')
+    parser.add_argument('--proof', action='store_true', help='ask for proofs as well as types')
+    parser.add_argument('--large', action='store_true', help='include the large lambda term')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--max-line', type=int, default=DEFAULT_MAX_LINE, help='longest response line in bytes')
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,51 @@
+"""Measure how the time and memory taken by `infer_type()` scale with term size.
+
+Generates random well-typed terms of doubling sizes using a fixed seed, so that
+the results are repeatable, and type checks each one. For example:
+    $ python benchmarks/typecheck_scaling.py --min-size 64 --max-size 8192
+
+Pass `--memory` to also report peak memory use, measured with tracemalloc in a
+second run of each term so that it doesn't distort the timings.
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tapl import SimplyTypedLambdaCalculus
+from tapl.random_terms import TermGenerator, parse_type
+
+
+def main(args):
+    T = parse_type(args.type)
+    print(f'{"size":>9} {"chars":>10} {"seconds":>9}' + (f' {"peak MB":>9}' if args.memory else ''))
+    size = args.min_size
+    while size <= args.max_size:
+        term = TermGenerator(args.seed, if_density=args.if_density).generate(T, size)
+        start = time.perf_counter()
+        SimplyTypedLambdaCalculus.infer_type(term)
+        elapsed = time.perf_counter() - start
+        line = f'{size:9} {len(term):10} {elapsed:9.3f}'
+        if args.memory:
+            tracemalloc.start()
+            SimplyTypedLambdaCalculus.infer_type(term)
+            (_, peak) = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            line += f' {peak / 1e6:9.1f}'
+        print(line, flush=True)
+        size *= 2
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--type', default='Bool → Bool')
+    parser.add_argument('--min-size', type=int, default=64)
+    parser.add_argument('--max-size', type=int, default=4096)
+    parser.add_argument('--if-density', type=float, default=0.2)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--memory', action='store_true', help='also report peak memory use')
+    main(parser.parse_args())
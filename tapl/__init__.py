@@ -1 +1,33 @@
-from .chapter_09_simply_typed_lambda_calculus import SimplyTypedLambdaCalculus
+"""Code from "Types and Programming Languages" organised by chapter.
+
+The chapter modules build their grammars and rules when they are imported,
+which is relatively slow. Rather than paying that cost whenever `tapl` is
+imported we only import a chapter module the first time one of its names is
+looked up on the package. So `import tapl` is cheap, while
+`from tapl import SimplyTypedLambdaCalculus` works exactly as before.
+"""
+
+import importlib
+
+# Maps each public name to the chapter module which defines it.
+_lazy_names = {
+    'SimplyTypedLambdaCalculus': 'chapter_09_simply_typed_lambda_calculus',
+}
+
+__all__ = sorted(_lazy_names)
+
+
+def __getattr__(name):
+    """Import and return `name` from its chapter module on first use."""
+    try:
+        module_name = _lazy_names[name]
+    except KeyError:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}') from None
+    value = getattr(importlib.import_module(f'.{module_name}', __name__), name)
+    # Cache the value so that __getattr__ isn't called for it again.
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_lazy_names))
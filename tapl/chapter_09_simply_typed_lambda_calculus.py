@@ -2,6 +2,8 @@ import re
 
 from inference import Syntax, Rule, Rules
 
+from . import profiling
+
 
 class SimplyTypedLambdaCalculus(Rules):
     # Syntax
@@ -75,4 +77,6 @@ class SimplyTypedLambdaCalculus(Rules):
     @classmethod
     def infer_type(cls, expression, context='∅'):
         goal = f'{context} ⊢ {expression} : {{__result__}}'
-        return cls.solve(goal)
+        if profiling.active is None:
+            return cls.solve(goal)
+        return profiling.active.solve(cls, goal, name='infer_type')
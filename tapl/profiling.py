@@ -0,0 +1,116 @@
+"""Opt-in instrumentation which records which typing rules are used.
+
+Profiling is switched on with the `profile_rules()` context manager which
+returns a `RuleStats` object. While it is active every call to `infer_type()`
+is recorded. For example:
+
+    with profile_rules() as stats:
+        SimplyTypedLambdaCalculus.infer_type(expression)
+    print(stats.to_json())
+    stats.dump_stats('rules.prof')  # Can be loaded by pstats or snakeviz.
+
+The stats have the same shape as those recorded by chapter 4's
+`rule_profiling`: `rules` and `calls` map names to `Stat`s, and `to_json()`
+returns both. The `inference` library doesn't tell us about the rules it tries
+and then abandons during its search, though. So attempts and times are only
+known for each call to `solve()` as a whole, and these are kept in `calls`
+under the name of the method which called `solve()`. For each rule in `rules`
+we only know `successes`, which is the number of times it appears in the
+proofs found. Its other fields are None.
+
+When profiling is not active the only overhead is a single check of
+`profiling.active` per call to `infer_type()`.
+"""
+
+import contextlib
+import json
+import marshal
+import time
+
+
+# The RuleStats object being recorded into or None if profiling is not active.
+active = None
+
+
+class Stat:
+    """The performance of a single rule or function. Fields we can't measure are None."""
+
+    def __init__(self, attempts=0, successes=0, time=0.0, cumulative_time=0.0):
+        self.attempts = attempts
+        self.successes = successes
+        # Time spent in the function itself, excluding the functions it called.
+        self.time = time
+        # Time spent in the function including the functions it called.
+        self.cumulative_time = cumulative_time
+
+    def as_dict(self):
+        return dict(self.__dict__)
+
+
+class RuleStats:
+    """Timings of calls to `solve()` and counts of the rules used in the resulting proofs."""
+
+    def __init__(self):
+        self.rules = {}
+        self.calls = {}
+
+    def __getitem__(self, name):
+        return self.rules[name]
+
+    def solve(self, rules, goal, name='solve'):
+        """Call `rules.solve(goal)` and record how it went under `name`."""
+        stat = self.calls.get(name)
+        if stat is None:
+            stat = self.calls[name] = Stat()
+        stat.attempts += 1
+        start = time.perf_counter()
+        try:
+            result = rules.solve(goal)
+        finally:
+            # We can't see inside solve() so all of its time is its own.
+            elapsed = time.perf_counter() - start
+            stat.time += elapsed
+            stat.cumulative_time += elapsed
+        stat.successes += 1
+        # Walk the proof iteratively since proofs of large terms can be deeper
+        # than the recursion limit.
+        proofs = [result.proof]
+        while proofs:
+            proof = proofs.pop()
+            rule_stat = self.rules.get(proof.rule.name)
+            if rule_stat is None:
+                rule_stat = self.rules[proof.rule.name] = Stat(attempts=None, time=None, cumulative_time=None)
+            rule_stat.successes += 1
+            proofs.extend(proof.premises)
+        return result
+
+    def to_json(self, **kwargs):
+        """Return the stats as a JSON string. `kwargs` are passed to json.dumps()."""
+        return json.dumps({
+            'rules': {name: stat.as_dict() for (name, stat) in self.rules.items()},
+            'calls': {name: stat.as_dict() for (name, stat) in self.calls.items()},
+        }, **kwargs)
+
+    def dump_stats(self, filename):
+        """Write the timings of the calls to `filename` in the format used by cProfile.
+
+        The resulting file can be loaded with `pstats.Stats(filename)`. The
+        rules aren't included since we have no timings for them.
+        """
+        stats = {
+            ('~', 0, name): (stat.attempts, stat.attempts, stat.time, stat.cumulative_time, {})
+            for (name, stat) in self.calls.items()
+        }
+        with open(filename, 'wb') as f:
+            marshal.dump(stats, f)
+
+
+@contextlib.contextmanager
+def profile_rules():
+    """Record the rules used by every `infer_type()` inside the `with` block."""
+    global active
+    previous, active = active, RuleStats()
+    try:
+        yield active
+    finally:
+        active = previous
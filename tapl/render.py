@@ -0,0 +1,173 @@
+"""Render derivations from `infer_type()` a line at a time.
+
+The text rendering of a proof lays the whole derivation out as one picture,
+which for large terms means building a multi-megabyte string with lines
+hundreds of characters wide before anything is shown. The renderers here
+instead write a derivation to a file-like object one line per step. Apart from
+the proof itself they only keep the path from the root to the current step in
+memory, along with the line numbers of the premises already written for each
+step on that path.
+
+There are two styles:
+ - `write_derivation()` numbers each step and lists premises before the
+   conclusions which depend on them, like a written proof:
+       1  (x : Bool ∈ (x : Bool , ∅))  [M_HEAD]
+       2  ((x : Bool , ∅) ⊢ x : Bool)  [T_VAR 1]
+ - `write_tree()` draws the derivation as an indented tree with the
+   conclusion at the top:
+       ((x : Bool , ∅) ⊢ x : Bool)  [T_VAR]
+       └── (x : Bool ∈ (x : Bool , ∅))  [M_HEAD]
+
+Both take the same options to elide parts of huge proofs:
+ - `max_depth` stops rendering premises of steps more than `max_depth` steps
+   below the root, and reports how many steps were left out instead.
+ - `collapse` is a collection of rule names. A chain of steps using only
+   those rules is shown as a single step labelled with the rules used. E.g.
+   with `collapse=MEMBERSHIP_RULES` a list membership proof is shown as one
+   step labelled "M_TAIL ×3, M_HEAD".
+
+For example, to look at the top of the derivation of a large term:
+    $ python -m tapl.render data/large_lambda_term.txt --tree --max-depth 6 --collapse
+"""
+
+import argparse
+import sys
+
+MEMBERSHIP_RULES = ('M_HEAD', 'M_TAIL')
+
+
+def _collapse_chain(proof, collapse):
+    """Follow the chain of steps from `proof` which use rules in `collapse`.
+
+    Returns a label describing the rules used and the last step in the chain,
+    whose premises are the premises of the collapsed step.
+    """
+    names = [proof.rule.name]
+    if proof.rule.name in collapse:
+        while len(proof.premises) == 1 and proof.premises[0].rule.name in collapse:
+            proof = proof.premises[0]
+            names.append(proof.rule.name)
+    # Run length encode the rule names, e.g. M_TAIL, M_TAIL, M_HEAD
+    # becomes "M_TAIL ×2, M_HEAD".
+    runs = []
+    for name in names:
+        if runs and runs[-1][0] == name:
+            runs[-1][1] += 1
+        else:
+            runs.append([name, 1])
+    label = ', '.join(name if count == 1 else f'{name} ×{count}' for (name, count) in runs)
+    return (label, proof)
+
+
+def _count_steps(proofs):
+    """Return the number of steps in all of `proofs` and their premises."""
+    count = 0
+    proofs = list(proofs)
+    while proofs:
+        proof = proofs.pop()
+        count += 1
+        proofs.extend(proof.premises)
+    return count
+
+
+def write_derivation(proof, file, max_depth=None, collapse=()):
+    """Write `proof` to `file` as numbered steps with premises before conclusions.
+
+    Returns the number of lines written. See the module docstring for `max_depth`
+    and `collapse`.
+    """
+    # Walk the proof depth first using an explicit stack, since proofs of
+    # large terms can be deeper than the recursion limit. Each entry is
+    # [conclusion, label, premises, index of the next premise to write, line
+    # numbers of premises already written, number of steps elided].
+    line_number = 0
+
+    def push(proof):
+        (label, last) = _collapse_chain(proof, collapse)
+        premises = last.premises
+        elided = 0
+        if max_depth is not None and len(stack) >= max_depth and premises:
+            elided = _count_steps(premises)
+            premises = ()
+        stack.append([proof.conclusion, label, premises, 0, [], elided])
+
+    stack = []
+    push(proof)
+    while stack:
+        entry = stack[-1]
+        (conclusion, label, premises, next_premise, premise_numbers, elided) = entry
+        if next_premise < len(premises):
+            entry[3] += 1
+            push(premises[next_premise])
+            continue
+        stack.pop()
+        line_number += 1
+        references = label
+        if premise_numbers:
+            references += ' ' + ', '.join(map(str, premise_numbers))
+        if elided:
+            references += f' from {elided} elided steps'
+        file.write(f'{line_number}  {conclusion}  [{references}]\n')
+        if stack:
+            stack[-1][4].append(line_number)
+    return line_number
+
+
+def write_tree(proof, file, max_depth=None, collapse=()):
+    """Write `proof` to `file` as an indented tree with the conclusion at the top.
+
+    Returns the number of lines written. See the module docstring for `max_depth`
+    and `collapse`.
+    """
+    lines = 0
+    # Each entry is [premises, index of the next premise to write, prefix for
+    # the lines of the premises].
+    stack = []
+
+    def write_step(proof, prefix, child_prefix):
+        nonlocal lines
+        (label, last) = _collapse_chain(proof, collapse)
+        file.write(f'{prefix}{proof.conclusion}  [{label}]\n')
+        lines += 1
+        premises = last.premises
+        if max_depth is not None and len(stack) >= max_depth and premises:
+            file.write(f'{child_prefix}└── ⋯ {_count_steps(premises)} elided steps\n')
+            lines += 1
+        elif premises:
+            stack.append([premises, 0, child_prefix])
+
+    write_step(proof, '', '')
+    while stack:
+        entry = stack[-1]
+        (premises, next_premise, child_prefix) = entry
+        if next_premise == len(premises):
+            stack.pop()
+            continue
+        entry[1] += 1
+        if next_premise == len(premises) - 1:
+            write_step(premises[next_premise], child_prefix + '└── ', child_prefix + '    ')
+        else:
+            write_step(premises[next_premise], child_prefix + '├── ', child_prefix + '│   ')
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Infer the type of a term and write its derivation.')
+    parser.add_argument('filename', help='file containing the term')
+    parser.add_argument('--context', default='∅')
+    parser.add_argument('--tree', action='store_true', help='draw an indented tree rather than numbered steps')
+    parser.add_argument('--max-depth', type=int, help='elide steps more than this many steps below the root')
+    parser.add_argument('--collapse', action='store_true', help='collapse M_HEAD/M_TAIL chains into a single step')
+    args = parser.parse_args()
+
+    from tapl import SimplyTypedLambdaCalculus
+
+    with open(args.filename, encoding='utf-8') as f:
+        expression = f.read()
+    result = SimplyTypedLambdaCalculus.infer_type(expression, context=args.context)
+    write = write_tree if args.tree else write_derivation
+    write(result.proof, sys.stdout, args.max_depth, MEMBERSHIP_RULES if args.collapse else ())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,325 @@
+"""A long running server which infers the types of Simply Typed Lambda Calculus terms.
+
+Starting a new Python process and importing `tapl` for every expression is
+slow. Instead run this server once and send it requests. For example:
+    $ python -m tapl.server --port 8765
+    $ python -m tapl.server --unix /tmp/tapl.sock
+
+The protocol is newline-delimited JSON. Each request is a JSON object on a
+single line:
+    {"id": 1, "expression": "(λx:Bool. x) true", "context": "∅", "proof": false}
+Only "expression" is required. "id" is copied into the response so that
+clients can match up responses with requests, since responses are sent as soon
+as they are ready and not necessarily in the order the requests arrived in.
+The response is one of:
+    {"id": 1, "type": "Bool"}
+    {"id": 1, "type": "Bool", "proof": "..."}
+    {"id": 1, "error": "..."}
+Request lines longer than `--max-line` bytes get an error response.
+Sending {"id": 2, "metrics": true} returns request counts and latency
+percentiles (in milliseconds) instead.
+
+Type checking is done in a pool of worker processes. Requests which arrive
+close together are sent to the pool in batches, which are shared out between
+the workers, and identical requests which are waiting at the same time are only
+type checked once. If a worker process dies the pool is replaced.
+"""
+
+import argparse
+import asyncio
+import collections
+import concurrent.futures
+import functools
+import json
+import math
+import time
+
+# The longest request line we accept. Large enough for the 10MB terms made by
+# `tapl.random_terms`.
+DEFAULT_MAX_LINE = 32 * 1024 * 1024
+
+
+def _warm_up():
+    """Import the type checker when a worker process starts rather than on its first request."""
+    from tapl import SimplyTypedLambdaCalculus
+
+
+def _infer_types(requests):
+    """Infer the types of a batch of (expression, context, include_proof) tuples.
+
+    This runs in a worker process. It returns a response dict for each request.
+    """
+    from tapl import SimplyTypedLambdaCalculus
+    from inference import NoProofFoundError
+
+    responses = []
+    for (expression, context, include_proof) in requests:
+        try:
+            result = SimplyTypedLambdaCalculus.infer_type(expression, context=context)
+        except NoProofFoundError:
+            responses.append({'error': f'{expression} is not well-typed'})
+        except Exception as e:
+            # Most likely a syntax error. Report it rather than letting one
+            # bad request fail the whole batch.
+            responses.append({'error': f'{type(e).__name__}: {e}'})
+        else:
+            response = {'type': str(result)}
+            if include_proof:
+                response['proof'] = str(result.proof)
+            responses.append(response)
+    return responses
+
+
+class LatencyMetrics:
+    """Counts of requests and the latencies of the most recent ones."""
+
+    def __init__(self, window=10000):
+        self.requests = 0
+        self.errors = 0
+        self.deduplicated = 0
+        self.batches = 0
+        self.latencies = collections.deque(maxlen=window)
+
+    def percentile(self, p):
+        """Return the `p`th percentile of the recent latencies in ms, or None if there aren't any."""
+        if not self.latencies:
+            return None
+        latencies = sorted(self.latencies)
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p / 100))] * 1000
+
+    def as_dict(self):
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'deduplicated': self.deduplicated,
+            'batches': self.batches,
+            'p50_ms': self.percentile(50),
+            'p99_ms': self.percentile(99),
+        }
+
+
+class TypeChecker:
+    """Batches and deduplicates requests before sending them to `executor`.
+
+    Each batch is split into a chunk per worker so that the whole pool works
+    on it at once. If `make_executor` is given it is called to replace the
+    executor when it breaks, e.g. because a worker process was killed.
+    """
+
+    def __init__(self, executor, batch_size=16, batch_delay=0.002, make_executor=None):
+        self.executor = executor
+        self.make_executor = make_executor
+        # Both ThreadPoolExecutor and ProcessPoolExecutor work out their
+        # default number of workers themselves, so ask them.
+        self.workers = getattr(executor, '_max_workers', 1)
+        self.batch_size = batch_size
+        self.batch_delay = batch_delay
+        self.metrics = LatencyMetrics()
+        # Futures for every request which has been queued or sent to the
+        # executor but which hasn't got a response yet, keyed by request.
+        self._pending = {}
+        self._queue = []
+        self._flush_handle = None
+
+    async def infer_type(self, expression, context='∅', include_proof=False):
+        """Return the response dict for a single request."""
+        key = (expression, context, include_proof)
+        future = self._pending.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = self._pending[key] = loop.create_future()
+            self._queue.append(key)
+            if len(self._queue) >= self.batch_size:
+                self._flush()
+            elif self._flush_handle is None:
+                self._flush_handle = loop.call_later(self.batch_delay, self._flush)
+        else:
+            self.metrics.deduplicated += 1
+        # Shield the shared future so one client disconnecting doesn't cancel
+        # it for everyone else waiting on the same request.
+        return await asyncio.shield(future)
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._queue = self._queue, []
+        if not batch:
+            return
+        self.metrics.batches += 1
+        loop = asyncio.get_running_loop()
+        chunk_size = math.ceil(len(batch) / self.workers)
+        for start in range(0, len(batch), chunk_size):
+            chunk = batch[start:start + chunk_size]
+            executor = self.executor
+            try:
+                done = loop.run_in_executor(executor, _infer_types, chunk)
+            except concurrent.futures.BrokenExecutor as e:
+                # Report it to the waiters in the same way as a pool which
+                # breaks while running the chunk.
+                done = loop.create_future()
+                done.set_exception(e)
+            done.add_done_callback(functools.partial(self._resolve, chunk, executor))
+
+    def _resolve(self, chunk, executor, done):
+        if done.cancelled():
+            error = RuntimeError('type checking was cancelled')
+        else:
+            error = done.exception()
+        if isinstance(error, concurrent.futures.BrokenExecutor):
+            self._replace_executor(executor)
+        for (i, key) in enumerate(chunk):
+            future = self._pending.pop(key)
+            if future.cancelled():
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(done.result()[i])
+
+    def _replace_executor(self, broken):
+        # Every chunk which was running on the broken executor fails, but only
+        # the first one to be resolved should replace it.
+        if self.make_executor is None or broken is not self.executor:
+            return
+        self.executor = self.make_executor()
+        broken.shutdown(wait=False)
+
+
+class Server:
+    """Handles connections from clients speaking newline-delimited JSON."""
+
+    def __init__(self, type_checker, max_line=DEFAULT_MAX_LINE):
+        self.type_checker = type_checker
+        self.max_line = max_line
+
+    async def handle_connection(self, reader, writer):
+        tasks = set()
+        try:
+            while True:
+                try:
+                    line = await reader.readuntil(b'\n')
+                except asyncio.IncompleteReadError as e:
+                    # End of the stream. The last line may not end in a newline.
+                    line = e.partial
+                except asyncio.LimitOverrunError:
+                    metrics = self.type_checker.metrics
+                    metrics.requests += 1
+                    metrics.errors += 1
+                    self.write_response(writer, {'error': f'Bad request: line longer than {self.max_line} bytes'})
+                    if not await _skip_line(reader):
+                        break
+                    continue
+                if not line:
+                    break
+                if line.strip():
+                    # Handle each request in its own task so that a slow request
+                    # doesn't hold up the ones behind it on the same connection.
+                    task = asyncio.create_task(self.handle_line(line, writer))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+                if not line.endswith(b'\n'):
+                    break
+            if tasks:
+                await asyncio.wait(tasks)
+        finally:
+            writer.close()
+
+    async def handle_line(self, line, writer):
+        start = time.perf_counter()
+        metrics = self.type_checker.metrics
+        try:
+            request = json.loads(line)
+        except ValueError as e:
+            request = None
+            response = {'error': f'Bad request: {e}'}
+        else:
+            if isinstance(request, dict):
+                response = await self.respond(request)
+            else:
+                request = None
+                response = {'error': 'Bad request: expected a JSON object'}
+        if 'metrics' not in response:
+            metrics.requests += 1
+            metrics.errors += 'error' in response
+            metrics.latencies.append(time.perf_counter() - start)
+        if request is not None and 'id' in request:
+            response = {'id': request['id'], **response}
+        self.write_response(writer, response)
+        await writer.drain()
+
+    async def respond(self, request):
+        """Return the response dict for the decoded JSON object `request`."""
+        if request.get('metrics'):
+            return {'metrics': self.type_checker.metrics.as_dict()}
+        expression = request.get('expression')
+        context = request.get('context', '∅')
+        if not isinstance(expression, str):
+            return {'error': 'Bad request: "expression" must be a string'}
+        if not isinstance(context, str):
+            return {'error': 'Bad request: "context" must be a string'}
+        try:
+            return await self.type_checker.infer_type(expression, context, bool(request.get('proof', False)))
+        except Exception as e:
+            return {'error': f'{type(e).__name__}: {e}'}
+
+    def write_response(self, writer, response):
+        writer.write(json.dumps(response, ensure_ascii=False).encode() + b'\n')
+
+
+async def _skip_line(reader):
+    """Discard the rest of a line which was too long to read.
+
+    Returns False if the stream ended before the end of the line.
+    """
+    while True:
+        try:
+            await reader.readuntil(b'\n')
+            return True
+        except asyncio.LimitOverrunError as e:
+            await reader.readexactly(e.consumed)
+        except asyncio.IncompleteReadError:
+            return False
+
+
+async def serve(host='127.0.0.1', port=8765, unix=None, workers=None, batch_size=16, batch_delay=0.002,
+                max_line=DEFAULT_MAX_LINE):
+    """Run the server until cancelled."""
+    def make_executor():
+        return concurrent.futures.ProcessPoolExecutor(max_workers=workers, initializer=_warm_up)
+
+    type_checker = TypeChecker(make_executor(), batch_size, batch_delay, make_executor)
+    try:
+        server = Server(type_checker, max_line)
+        if unix is not None:
+            listener = await asyncio.start_unix_server(server.handle_connection, path=unix, limit=max_line)
+        else:
+            listener = await asyncio.start_server(server.handle_connection, host, port, limit=max_line)
+        addresses = ', '.join(str(socket.getsockname()) for socket in listener.sockets)
+        print(f'Serving on {addresses}', flush=True)
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        type_checker.executor.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--unix', metavar='PATH', help='listen on a Unix socket rather than TCP')
+    parser.add_argument('--workers', type=int, help='number of worker processes (default: number of CPUs)')
+    parser.add_argument('--batch-size', type=int, default=16)
+    parser.add_argument('--batch-delay', type=float, default=0.002, help='seconds to wait for a batch to fill')
+    parser.add_argument('--max-line', type=int, default=DEFAULT_MAX_LINE, help='longest request line in bytes')
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(
+            args.host, args.port, args.unix, args.workers, args.batch_size, args.batch_delay, args.max_line,
+        ))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+import json
+import pstats
+
+import pytest
+
+from tapl import profiling
+
+
+class Rule:
+    def __init__(self, name):
+        self.name = name
+
+
+class Proof:
+    def __init__(self, rule_name, *premises):
+        self.rule = Rule(rule_name)
+        self.premises = list(premises)
+
+
+class Result(tuple):
+    pass
+
+
+class StubRules:
+    """Stands in for SimplyTypedLambdaCalculus, solving every goal with the same proof."""
+
+    @classmethod
+    def solve(cls, goal):
+        if goal == 'bad':
+            raise ValueError(goal)
+        result = Result(('Bool',))
+        result.proof = Proof(
+            'T_APP',
+            Proof('T_ABS', Proof('T_VAR', Proof('M_TAIL', Proof('M_HEAD')))),
+            Proof('T_TRUE'),
+        )
+        return result
+
+
+def test_profiling_is_inactive_by_default():
+    assert profiling.active is None
+
+
+def test_profile_rules_is_active_inside_with_block():
+    with profiling.profile_rules() as stats:
+        assert profiling.active is stats
+    assert profiling.active is None
+
+
+def test_solve_returns_result_and_records_call():
+    stats = profiling.RuleStats()
+    result = stats.solve(StubRules, 'goal', name='infer_type')
+    assert result == ('Bool',)
+    assert stats.calls['infer_type'].attempts == 1
+    assert stats.calls['infer_type'].successes == 1
+    assert stats.calls['infer_type'].time > 0
+
+
+def test_solve_counts_uses_of_rules_in_proof():
+    stats = profiling.RuleStats()
+    stats.solve(StubRules, 'goal')
+    stats.solve(StubRules, 'goal')
+    assert {name: stat.successes for (name, stat) in stats.rules.items()} == {
+        'T_APP': 2, 'T_ABS': 2, 'T_VAR': 2, 'M_TAIL': 2, 'M_HEAD': 2, 'T_TRUE': 2,
+    }
+    assert stats['T_APP'].attempts is None
+    assert stats['T_APP'].time is None
+    assert list(stats.calls) == ['solve']
+
+
+def test_failed_solve_counts_attempt_but_not_success():
+    stats = profiling.RuleStats()
+    with pytest.raises(ValueError):
+        stats.solve(StubRules, 'bad')
+    assert stats.calls['solve'].attempts == 1
+    assert stats.calls['solve'].successes == 0
+    assert not stats.rules
+
+
+def test_to_json_separates_rules_from_calls():
+    stats = profiling.RuleStats()
+    stats.solve(StubRules, 'goal', name='infer_type')
+    data = json.loads(stats.to_json())
+    assert set(data) == {'rules', 'calls'}
+    assert set(data['calls']) == {'infer_type'}
+    assert data['calls']['infer_type']['time'] == data['calls']['infer_type']['cumulative_time']
+    assert data['rules']['M_TAIL'] == {'attempts': None, 'successes': 1, 'time': None, 'cumulative_time': None}
+
+
+def test_dump_stats_only_includes_calls(tmp_path):
+    stats = profiling.RuleStats()
+    stats.solve(StubRules, 'goal', name='infer_type')
+    stats.solve(StubRules, 'goal', name='infer_type')
+    filename = str(tmp_path / 'rules.prof')
+    stats.dump_stats(filename)
+    loaded = pstats.Stats(filename)
+    assert [func[2] for func in loaded.stats] == ['infer_type']
+    assert loaded.total_calls == 2
@@ -0,0 +1,156 @@
+import io
+import re
+
+import pytest
+
+from tapl.random_terms import BOOL, TermGenerator, format_type, parse_type, result_arrows, variable_name
+
+# Tokens of the terms written by TermGenerator, which always parenthesises
+# `if`s, λs, applications and arrow types.
+token_pattern = re.compile(r"\(if|\(λ|true|false|then|else|Bool|→|[a-z]'*|[().:]")
+
+
+def check_type(term):
+    """Return the type of `term` and the deepest nesting of λs in it.
+
+    This is a small type checker which is independent of both the generator
+    and the `inference` library. It fails with an AssertionError or KeyError
+    (for unbound variables) if `term` is not well-typed.
+    """
+    tokens = token_pattern.findall(term)
+    assert ''.join(tokens) == term.replace(' ', '')
+    position = 0
+    deepest = 0
+
+    def take(expected=None):
+        nonlocal position
+        token = tokens[position]
+        position += 1
+        if expected is not None:
+            assert token == expected, (expected, token, position)
+        return token
+
+    def parse_type_tokens():
+        if take() == BOOL:
+            return BOOL
+        T1 = parse_type_tokens()
+        take('→')
+        T2 = parse_type_tokens()
+        take(')')
+        return (T1, T2)
+
+    def check(context, depth):
+        nonlocal deepest
+        token = take()
+        if token in ('true', 'false'):
+            return BOOL
+        if token == '(if':
+            assert check(context, depth) == BOOL
+            take('then')
+            T = check(context, depth)
+            take('else')
+            assert check(context, depth) == T
+            take(')')
+            return T
+        if token == '(λ':
+            name = take()
+            take(':')
+            T1 = parse_type_tokens()
+            take('.')
+            assert name not in context, 'variables should never be shadowed'
+            deepest = max(deepest, depth + 1)
+            T2 = check({**context, name: T1}, depth + 1)
+            take(')')
+            return (T1, T2)
+        if token == '(':
+            (T1, T2) = check(context, depth)
+            assert check(context, depth) == T1
+            take(')')
+            return T2
+        return context[token]
+
+    T = check({}, 0)
+    assert position == len(tokens)
+    return (T, deepest)
+
+
+@pytest.mark.parametrize("text,expected", [
+    ('Bool', BOOL),
+    ('Bool → Bool', (BOOL, BOOL)),
+    ('Bool→Bool→Bool', (BOOL, (BOOL, BOOL))),
+    ('(Bool → Bool) → Bool', ((BOOL, BOOL), BOOL)),
+    ('((Bool))', BOOL),
+])
+def test_parse_type(text, expected):
+    assert parse_type(text) == expected
+
+
+@pytest.mark.parametrize("T", [BOOL, (BOOL, BOOL), ((BOOL, BOOL), (BOOL, (BOOL, BOOL)))])
+def test_format_type_round_trips_through_parse_type(T):
+    assert parse_type(format_type(T)) == T
+
+
+@pytest.mark.parametrize("text", ['', 'Int', 'Bool →', '(Bool', 'Bool)', 'Bool Bool', '→ Bool'])
+def test_parse_type_rejects_bad_input(text):
+    with pytest.raises(ValueError):
+        parse_type(text)
+
+
+def test_variable_name():
+    assert [variable_name(level) for level in (0, 1, 25, 26, 27, 52)] == ['a', 'b', 'z', "a'", "b'", "a''"]
+
+
+def test_same_seed_generates_same_term():
+    assert TermGenerator(5).generate(size=500) == TermGenerator(5).generate(size=500)
+    assert TermGenerator(5).generate(size=500) != TermGenerator(6).generate(size=500)
+
+
+def test_write_matches_generate():
+    f = io.StringIO()
+    written = TermGenerator(3).write(f, (BOOL, BOOL), size=5000, buffer_size=100)
+    assert f.getvalue() == TermGenerator(3).generate((BOOL, BOOL), size=5000)
+    assert written == len(f.getvalue())
+
+
+@pytest.mark.parametrize("seed", range(20))
+@pytest.mark.parametrize("type_text", ['Bool', 'Bool → Bool', '(Bool → Bool) → Bool → Bool'])
+def test_generated_terms_are_well_typed(seed, type_text):
+    T = parse_type(type_text)
+    generator = TermGenerator(seed, max_lambda_depth=seed % 5, if_density=(seed % 4) / 4)
+    (inferred, _) = check_type(generator.generate(T, size=seed * 10 + 1))
+    assert inferred == T
+
+
+@pytest.mark.parametrize("seed", range(10))
+@pytest.mark.parametrize("limit", [0, 1, 3, 8])
+@pytest.mark.parametrize("type_text", ['Bool', 'Bool → Bool', '(Bool → Bool) → Bool → Bool'])
+def test_lambda_depth_limit_is_respected(seed, limit, type_text):
+    # Only a type with more arrows than the limit can take a term over it.
+    T = parse_type(type_text)
+    generator = TermGenerator(seed, max_lambda_depth=limit)
+    (_, deepest) = check_type(generator.generate(T, size=300))
+    assert deepest <= max(limit, result_arrows(T))
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_max_chars_cuts_term_off(seed):
+    T = (BOOL, BOOL)
+    term = TermGenerator(seed).generate(T, size=5000, max_chars=2000)
+    (inferred, _) = check_type(term)
+    assert inferred == T
+    assert 2000 <= len(term) < 2500
+    assert TermGenerator(seed).generate(T, size=50, max_chars=100000) == TermGenerator(seed).generate(T, size=50)
+
+
+def test_if_density_zero_generates_no_ifs():
+    assert '(if' not in TermGenerator(1, if_density=0).generate(BOOL, size=300)
+
+
+@pytest.mark.parametrize("T,expected", [
+    (BOOL, 0),
+    ((BOOL, BOOL), 1),
+    (((BOOL, BOOL), BOOL), 1),
+    ((BOOL, (BOOL, BOOL)), 2),
+])
+def test_result_arrows(T, expected):
+    assert result_arrows(T) == expected
@@ -0,0 +1,110 @@
+import io
+
+from tapl.render import MEMBERSHIP_RULES, write_derivation, write_tree
+
+
+class Rule:
+    def __init__(self, name):
+        self.name = name
+
+
+class Proof:
+    def __init__(self, rule_name, conclusion, *premises):
+        self.rule = Rule(rule_name)
+        self.conclusion = conclusion
+        self.premises = list(premises)
+
+
+# The derivation of ∅ ⊢ (λx:Bool. x) true : Bool, with a longer context than
+# necessary to give a chain of M_TAILs.
+proof = Proof(
+    'T_APP', '(∅ ⊢ ((λ x : Bool . x) true) : Bool)',
+    Proof(
+        'T_ABS', '(∅ ⊢ (λ x : Bool . x) : (Bool → Bool))',
+        Proof(
+            'T_VAR', '(Γ ⊢ x : Bool)',
+            Proof('M_TAIL', '(x : Bool ∈ z, y, x)', Proof('M_TAIL', '(x : Bool ∈ y, x)', Proof('M_HEAD', '(x : Bool ∈ x)'))),
+        ),
+    ),
+    Proof('T_TRUE', '(∅ ⊢ true : Bool)'),
+)
+
+
+def render(write, proof, **kwargs):
+    f = io.StringIO()
+    lines = write(proof, f, **kwargs)
+    output = f.getvalue().splitlines()
+    assert lines == len(output)
+    return output
+
+
+def test_write_derivation():
+    assert render(write_derivation, proof) == [
+        '1  (x : Bool ∈ x)  [M_HEAD]',
+        '2  (x : Bool ∈ y, x)  [M_TAIL 1]',
+        '3  (x : Bool ∈ z, y, x)  [M_TAIL 2]',
+        '4  (Γ ⊢ x : Bool)  [T_VAR 3]',
+        '5  (∅ ⊢ (λ x : Bool . x) : (Bool → Bool))  [T_ABS 4]',
+        '6  (∅ ⊢ true : Bool)  [T_TRUE]',
+        '7  (∅ ⊢ ((λ x : Bool . x) true) : Bool)  [T_APP 5, 6]',
+    ]
+
+
+def test_write_derivation_collapses_membership_chains():
+    assert render(write_derivation, proof, collapse=MEMBERSHIP_RULES)[:2] == [
+        '1  (x : Bool ∈ z, y, x)  [M_TAIL ×2, M_HEAD]',
+        '2  (Γ ⊢ x : Bool)  [T_VAR 1]',
+    ]
+
+
+def test_write_derivation_elides_steps_below_max_depth():
+    assert render(write_derivation, proof, max_depth=1) == [
+        '1  (∅ ⊢ (λ x : Bool . x) : (Bool → Bool))  [T_ABS from 4 elided steps]',
+        '2  (∅ ⊢ true : Bool)  [T_TRUE]',
+        '3  (∅ ⊢ ((λ x : Bool . x) true) : Bool)  [T_APP 1, 2]',
+    ]
+    assert render(write_derivation, proof, max_depth=0) == [
+        '1  (∅ ⊢ ((λ x : Bool . x) true) : Bool)  [T_APP from 6 elided steps]',
+    ]
+
+
+def test_write_tree():
+    assert render(write_tree, proof) == [
+        '(∅ ⊢ ((λ x : Bool . x) true) : Bool)  [T_APP]',
+        '├── (∅ ⊢ (λ x : Bool . x) : (Bool → Bool))  [T_ABS]',
+        '│   └── (Γ ⊢ x : Bool)  [T_VAR]',
+        '│       └── (x : Bool ∈ z, y, x)  [M_TAIL]',
+        '│           └── (x : Bool ∈ y, x)  [M_TAIL]',
+        '│               └── (x : Bool ∈ x)  [M_HEAD]',
+        '└── (∅ ⊢ true : Bool)  [T_TRUE]',
+    ]
+
+
+def test_write_tree_collapses_membership_chains():
+    assert render(write_tree, proof, collapse=MEMBERSHIP_RULES)[3] == '│       └── (x : Bool ∈ z, y, x)  [M_TAIL ×2, M_HEAD]'
+
+
+def test_write_tree_elides_steps_below_max_depth():
+    assert render(write_tree, proof, max_depth=1) == [
+        '(∅ ⊢ ((λ x : Bool . x) true) : Bool)  [T_APP]',
+        '├── (∅ ⊢ (λ x : Bool . x) : (Bool → Bool))  [T_ABS]',
+        '│   └── ⋯ 4 elided steps',
+        '└── (∅ ⊢ true : Bool)  [T_TRUE]',
+    ]
+
+
+def test_collapse_only_follows_chains_of_collapsed_rules():
+    # M_HEAD isn't collapsed, so it stays as a premise of the M_TAIL chain.
+    assert render(write_tree, proof, collapse=('M_TAIL',))[2:5] == [
+        '│   └── (Γ ⊢ x : Bool)  [T_VAR]',
+        '│       └── (x : Bool ∈ z, y, x)  [M_TAIL ×2]',
+        '│           └── (x : Bool ∈ x)  [M_HEAD]',
+    ]
+
+
+def test_deep_proofs_do_not_hit_the_recursion_limit():
+    deep = Proof('M_HEAD', 'x')
+    for _ in range(5000):
+        deep = Proof('M_TAIL', 'x', deep)
+    assert render(write_derivation, deep)[-1] == '5001  x  [M_TAIL 5000]'
+    assert render(write_tree, deep, collapse=MEMBERSHIP_RULES) == ['x  [M_TAIL ×5000, M_HEAD]']
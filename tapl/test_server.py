@@ -0,0 +1,211 @@
+import asyncio
+import concurrent.futures
+import concurrent.futures.process
+import json
+import threading
+
+import pytest
+
+from tapl import server
+
+
+class StubInference:
+    """Stands in for `_infer_types`, recording the chunks it is called with."""
+
+    def __init__(self):
+        self.chunks = []
+        self.lock = threading.Lock()
+
+    def __call__(self, requests):
+        with self.lock:
+            self.chunks.append(list(requests))
+        responses = []
+        for (expression, context, include_proof) in requests:
+            if expression == 'fail':
+                raise ValueError('worker failed')
+            response = {'type': f'T({expression})'}
+            if include_proof:
+                response['proof'] = 'proof'
+            responses.append(response)
+        return responses
+
+
+@pytest.fixture
+def infer_types(monkeypatch):
+    stub = StubInference()
+    monkeypatch.setattr(server, '_infer_types', stub)
+    return stub
+
+
+class Writer:
+    """Stands in for an asyncio.StreamWriter, collecting the responses written to it."""
+
+    def __init__(self):
+        self.data = b''
+
+    def write(self, data):
+        self.data += data
+
+    async def drain(self):
+        pass
+
+    def responses(self):
+        return [json.loads(line) for line in self.data.splitlines()]
+
+
+class CancellingExecutor(concurrent.futures.ThreadPoolExecutor):
+    def submit(self, fn, *args):
+        future = concurrent.futures.Future()
+        future.cancel()
+        return future
+
+
+class BrokenExecutor(concurrent.futures.ThreadPoolExecutor):
+    def submit(self, fn, *args):
+        future = concurrent.futures.Future()
+        future.set_exception(concurrent.futures.process.BrokenProcessPool('a worker died'))
+        return future
+
+
+def infer_all(type_checker, *expressions):
+    async def main():
+        return await asyncio.wait_for(
+            asyncio.gather(*[type_checker.infer_type(e) for e in expressions], return_exceptions=True),
+            timeout=5,
+        )
+    return asyncio.run(main())
+
+
+def test_full_batch_is_sent_without_waiting(infer_types):
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+        type_checker = server.TypeChecker(executor, batch_size=3, batch_delay=60)
+        results = infer_all(type_checker, 'a', 'b', 'c')
+    assert results == [{'type': 'T(a)'}, {'type': 'T(b)'}, {'type': 'T(c)'}]
+    assert infer_types.chunks == [[('a', '∅', False), ('b', '∅', False), ('c', '∅', False)]]
+    assert type_checker.metrics.batches == 1
+
+
+def test_partial_batch_is_sent_after_delay(infer_types):
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+        type_checker = server.TypeChecker(executor, batch_size=100, batch_delay=0.01)
+        results = infer_all(type_checker, 'a', 'b')
+    assert results == [{'type': 'T(a)'}, {'type': 'T(b)'}]
+    assert len(infer_types.chunks) == 1
+    assert type_checker.metrics.batches == 1
+
+
+def test_batch_is_split_between_workers(infer_types):
+    with concurrent.futures.ThreadPoolExecutor(max_workers=3) as executor:
+        type_checker = server.TypeChecker(executor, batch_size=7, batch_delay=60)
+        results = infer_all(type_checker, *'abcdefg')
+    assert results == [{'type': f'T({e})'} for e in 'abcdefg']
+    assert sorted(len(chunk) for chunk in infer_types.chunks) == [1, 3, 3]
+    assert type_checker.metrics.batches == 1
+
+
+def test_identical_requests_are_only_checked_once(infer_types):
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+        type_checker = server.TypeChecker(executor, batch_size=100, batch_delay=0.01)
+        results = infer_all(type_checker, 'a', 'b', 'a', 'a')
+    assert results == [{'type': 'T(a)'}, {'type': 'T(b)'}, {'type': 'T(a)'}, {'type': 'T(a)'}]
+    assert infer_types.chunks == [[('a', '∅', False), ('b', '∅', False)]]
+    assert type_checker.metrics.deduplicated == 2
+    assert type_checker._pending == {}
+
+
+def test_failed_chunk_reaches_every_waiter(infer_types):
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+        type_checker = server.TypeChecker(executor, batch_size=100, batch_delay=0.01)
+        results = infer_all(type_checker, 'fail', 'b', 'fail')
+    assert all(isinstance(result, ValueError) for result in results)
+    assert type_checker._pending == {}
+
+
+def test_cancelled_chunk_reaches_every_waiter(infer_types):
+    with CancellingExecutor(max_workers=1) as executor:
+        type_checker = server.TypeChecker(executor, batch_size=100, batch_delay=0.01)
+        results = infer_all(type_checker, 'a', 'b', 'a')
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert type_checker._pending == {}
+
+
+def test_broken_executor_is_replaced(infer_types):
+    replacement = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+    with BrokenExecutor(max_workers=2) as executor:
+        type_checker = server.TypeChecker(executor, batch_size=100, batch_delay=0.01,
+                                          make_executor=lambda: replacement)
+        results = infer_all(type_checker, 'a', 'b')
+        assert all(isinstance(result, concurrent.futures.BrokenExecutor) for result in results)
+        assert type_checker.executor is replacement
+        assert infer_all(type_checker, 'a') == [{'type': 'T(a)'}]
+    replacement.shutdown()
+
+
+def handle_lines(*lines):
+    writer = Writer()
+
+    async def main():
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+            srv = server.Server(server.TypeChecker(executor, batch_delay=0.001))
+            for line in lines:
+                await srv.handle_line(line, writer)
+            return srv.type_checker.metrics
+
+    metrics = asyncio.run(main())
+    return (writer.responses(), metrics)
+
+
+def test_handle_line_copies_id_into_response(infer_types):
+    (responses, metrics) = handle_lines(
+        b'{"id": 7, "expression": "a"}\n',
+        b'{"id": "x", "expression": "b", "context": "c", "proof": true}\n',
+        b'{"expression": "c"}\n',
+    )
+    assert responses == [
+        {'id': 7, 'type': 'T(a)'},
+        {'id': 'x', 'type': 'T(b)', 'proof': 'proof'},
+        {'type': 'T(c)'},
+    ]
+    assert (metrics.requests, metrics.errors) == (3, 0)
+
+
+@pytest.mark.parametrize('line', [
+    b'not json\n',
+    b'[1, 2]\n',
+    b'"expression"\n',
+    b'{"id": 1}\n',
+    b'{"id": 1, "expression": 42}\n',
+    b'{"id": 1, "expression": "a", "context": ["c"]}\n',
+])
+def test_bad_requests_get_error_responses(infer_types, line):
+    (responses, metrics) = handle_lines(line)
+    assert len(responses) == 1
+    assert responses[0]['error'].startswith('Bad request')
+    assert (metrics.requests, metrics.errors) == (1, 1)
+    assert infer_types.chunks == []
+
+
+def test_over_long_line_is_skipped_and_connection_kept(infer_types):
+    async def main():
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+            srv = server.Server(server.TypeChecker(executor, batch_delay=0.001), max_line=64)
+            listener = await asyncio.start_server(srv.handle_connection, '127.0.0.1', 0, limit=64)
+            async with listener:
+                port = listener.sockets[0].getsockname()[1]
+                reader, writer = await asyncio.open_connection('127.0.0.1', port)
+                long_expression = 'x' * 1000
+                writer.write(json.dumps({'id': 1, 'expression': long_expression}).encode() + b'\n')
+                writer.write(b'{"id": 2, "expression": "a"}\n')
+                await writer.drain()
+                responses = [json.loads(await asyncio.wait_for(reader.readline(), 5)) for _ in range(2)]
+                writer.close()
+                await writer.wait_closed()
+            return (responses, srv.type_checker.metrics)
+
+    (responses, metrics) = asyncio.run(main())
+    assert responses == [
+        {'error': 'Bad request: line longer than 64 bytes'},
+        {'id': 2, 'type': 'T(a)'},
+    ]
+    assert (metrics.requests, metrics.errors) == (2, 1)
+    assert infer_types.chunks == [[('a', '∅', False)]]